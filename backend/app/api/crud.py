@@ -180,3 +180,41 @@ async def upsert_document_by_url(
     upserted_doc = schema.Document.from_orm(result.scalars().first())
     await db.commit()
     return upserted_doc
+
+
+async def upsert_documents_by_url(
+    db: AsyncSession, documents: List[schema.Document]
+) -> List[schema.Document]:
+    """
+    Create or update many documents based on their URLs, in a single statement.
+    
+    Process:
+        1. Dedupes documents by URL (last one wins)
+        2. Builds one multi-row upsert statement with:
+           - All document fields for insert
+           - Metadata update on conflict
+        3. Returns inserted/updated documents
+        4. Commits transaction
+        
+    Note:
+        Postgres rejects an upsert that touches the same row twice,
+        hence the dedupe by URL.
+    """
+    if not documents:
+        return []
+    documents_by_url = {document.url: document for document in documents}
+    stmt = insert(Document).values(
+        [
+            document.dict(include={"url", "metadata_map"})
+            for document in documents_by_url.values()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Document.url],
+        set_={"metadata_map": stmt.excluded.metadata_map},
+    )
+    stmt = stmt.returning(Document)
+    result = await db.execute(stmt)
+    upserted_docs = [schema.Document.from_orm(doc) for doc in result.scalars().all()]
+    await db.commit()
+    return upserted_docs
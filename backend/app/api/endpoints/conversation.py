@@ -5,11 +5,13 @@ import datetime
 import asyncio
 import logging
 from collections import OrderedDict
+from typing import Set
 from sqlalchemy.ext.asyncio import AsyncSession
 from sse_starlette.sse import EventSourceResponse
 from app.api.deps import get_db
 from app.api import crud
 from app import schema
+from app.chat.engine import warm_chat_engine
 from app.chat.messaging import (
     handle_chat_message,
     StreamedMessage,
@@ -27,6 +29,10 @@ from uuid import UUID
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# The event loop only keeps weak references to tasks, so hold on to the
+# detached chat engine warm-ups until they finish
+warm_up_tasks: Set[asyncio.Task] = set()
+
 
 @router.post("/")
 async def create_conversation(
@@ -41,14 +47,21 @@ async def create_conversation(
 
 @router.get("/{conversation_id}")
 async def get_conversation(
-    conversation_id: UUID, db: AsyncSession = Depends(get_db)
+    conversation_id: UUID,
+    db: AsyncSession = Depends(get_db),
 ) -> schema.Conversation:
     """
     Get a conversation by ID along with its messages and message subprocesses.
+    Also starts building its chat engine in the background, ahead of the first message.
     """
     conversation = await crud.fetch_conversation_with_messages(db, str(conversation_id))
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
+    # Detached rather than a BackgroundTask, which runs before the request's DB
+    # session is closed and would hold its connection for the whole warm-up
+    task = asyncio.create_task(warm_chat_engine(conversation))
+    warm_up_tasks.add(task)
+    task.add_done_callback(warm_up_tasks.discard)
     return conversation
 
 
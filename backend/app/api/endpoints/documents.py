@@ -4,7 +4,6 @@ from fastapi import Depends, APIRouter, HTTPException, Query, Response, Header
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-import s3fs
 import re
 from app.api.deps import get_db
 from app.api import crud
@@ -110,6 +109,8 @@ async def get_document_asset(filename: str, response: Response, range: str = Hea
     Stream PDF files directly from S3 with support for byte-range requests.
     Handles partial content loading for better performance with large PDFs.
     """
+    import s3fs
+
     logger.debug(f"Initializing S3 connection with endpoint: {settings.S3_ENDPOINT_URL}")
     s3_kwargs = {
         "anon": False,
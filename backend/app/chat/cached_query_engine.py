@@ -0,0 +1,81 @@
+import hashlib
+import logging
+from threading import Lock
+from typing import Iterable, Optional
+from cachetools import TTLCache
+from llama_index.indices.query.base import BaseQueryEngine
+from llama_index.prompts.mixin import PromptMixinType
+from llama_index.response.schema import RESPONSE_TYPE, Response
+from llama_index.schema import QueryBundle
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+response_cache = TTLCache(
+    maxsize=settings.QUERY_CACHE_MAX_SIZE, ttl=settings.QUERY_CACHE_TTL_SECONDS
+)
+response_cache_lock = Lock()
+
+
+class CachedQueryEngine(BaseQueryEngine):
+    """
+    Read-through response cache in front of another query engine.
+
+    Features:
+        - Keys on the document set, the LLM model name and the question text,
+          so the same question over the same guidelines is only answered once
+        - Entries expire after QUERY_CACHE_TTL_SECONDS
+        - Streaming responses are passed through uncached
+
+    Note:
+        A cache hit skips the wrapped engine entirely, so no sub-question
+        events are emitted for that query.
+    """
+
+    def __init__(
+        self,
+        query_engine: BaseQueryEngine,
+        doc_ids: Iterable[str],
+        model_name: str,
+        cache: Optional[TTLCache] = None,
+    ) -> None:
+        super().__init__(callback_manager=query_engine.callback_manager)
+        self._query_engine = query_engine
+        self._key_prefix = "\0".join([model_name, *sorted(doc_ids)])
+        self._cache = cache if cache is not None else response_cache
+
+    def _get_prompt_modules(self) -> PromptMixinType:
+        return {"query_engine": self._query_engine}
+
+    def _cache_key(self, query_bundle: QueryBundle) -> str:
+        return hashlib.blake2b(
+            f"{self._key_prefix}\0{query_bundle.query_str}".encode()
+        ).hexdigest()
+
+    def _get_cached(self, key: str) -> Optional[Response]:
+        with response_cache_lock:
+            response = self._cache.get(key)
+        if response is not None:
+            logger.debug("Query response cache hit for key %s", key)
+        return response
+
+    def _set_cached(self, key: str, response: RESPONSE_TYPE) -> None:
+        if isinstance(response, Response):
+            with response_cache_lock:
+                self._cache[key] = response
+
+    def _query(self, query_bundle: QueryBundle) -> RESPONSE_TYPE:
+        key = self._cache_key(query_bundle)
+        response = self._get_cached(key)
+        if response is None:
+            response = self._query_engine.query(query_bundle)
+            self._set_cached(key, response)
+        return response
+
+    async def _aquery(self, query_bundle: QueryBundle) -> RESPONSE_TYPE:
+        key = self._cache_key(query_bundle)
+        response = self._get_cached(key)
+        if response is None:
+            response = await self._query_engine.aquery(query_bundle)
+            self._set_cached(key, response)
+        return response
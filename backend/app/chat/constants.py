@@ -1,4 +1,5 @@
 DB_DOC_ID_KEY = "db_document_id"
+CONTENT_HASH_KEY = "content_hash"
 
 SYSTEM_MESSAGE = """
 You are an expert financial analyst that always answers questions with the most relevant information using the tools at your disposal.
@@ -44,3 +45,7 @@ The current date is: {curr_date}
 
 NODE_PARSER_CHUNK_SIZE = 512
 NODE_PARSER_CHUNK_OVERLAP = 10
+
+# Chunks sent per embeddings request. The API accepts up to 2048 inputs, but
+# 512 chunks of NODE_PARSER_CHUNK_SIZE tokens keeps a request under its token cap
+EMBED_BATCH_SIZE = 512
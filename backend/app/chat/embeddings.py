@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from diskcache import Cache
+from openai import AsyncOpenAI, OpenAI as SyncOpenAI
+from llama_index.bridge.pydantic import PrivateAttr
+from llama_index.embeddings.fastembed import FastEmbedEmbedding
+from llama_index.embeddings.openai import OpenAIEmbedding
+from app.core.config import settings
+from app.chat.constants import EMBED_BATCH_SIZE
+from app.chat.openai_clients import get_openai_clients
+
+OPENAI_EMBED_DIM = 1536
+FASTEMBED_EMBED_DIMS = {
+    "BAAI/bge-small-en-v1.5": 384,
+    "BAAI/bge-base-en-v1.5": 768,
+    "sentence-transformers/all-MiniLM-L6-v2": 384,
+}
+
+embedding_cache_instance: Optional[Cache] = None
+
+
+def get_embedding_cache_singleton() -> Cache:
+    """
+    Get or create the on-disk embedding cache shared by all embedding models.
+    """
+    global embedding_cache_instance
+    if embedding_cache_instance is None:
+        embedding_cache_instance = Cache(settings.EMBEDDING_CACHE_DIR)
+    return embedding_cache_instance
+
+
+class CachedOpenAIEmbedding(OpenAIEmbedding):
+    """
+    OpenAI embedding model backed by a content-addressed on-disk cache.
+
+    Features:
+        - Cache keys are a hash of the model name and the chunk text, so
+          switching embedding models never serves stale vectors
+        - Only chunks missing from the cache are sent to OpenAI, in one batch
+        - Results are returned in the same order as the input texts
+        - Reuses the shared, connection-pooled OpenAI clients
+    """
+
+    _cache: Cache = PrivateAttr()
+
+    def __init__(self, cache: Optional[Cache] = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._cache = cache if cache is not None else get_embedding_cache_singleton()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedOpenAIEmbedding"
+
+    def _get_clients(self) -> Tuple[SyncOpenAI, AsyncOpenAI]:
+        return get_openai_clients(**self._get_credential_kwargs()) or super()._get_clients()
+
+    def _cache_key(self, text: str) -> str:
+        return hashlib.blake2b(f"{self.model_name}\0{text}".encode()).hexdigest()
+
+    def _lookup(
+        self, texts: List[str]
+    ) -> Tuple[List[str], List[Optional[List[float]]], List[int]]:
+        """Returns cache keys, cached embeddings (None on miss) and miss indices."""
+        keys = [self._cache_key(text) for text in texts]
+        embeddings = [self._cache.get(key) for key in keys]
+        misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        return keys, embeddings, misses
+
+    def _store(
+        self,
+        keys: List[str],
+        embeddings: List[Optional[List[float]]],
+        misses: List[int],
+        fresh_embeddings: List[List[float]],
+    ) -> List[List[float]]:
+        for i, embedding in zip(misses, fresh_embeddings):
+            self._cache.set(keys[i], embedding)
+            embeddings[i] = embedding
+        return embeddings
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        keys, embeddings, misses = self._lookup(texts)
+        if not misses:
+            return embeddings
+        fresh_embeddings = super()._get_text_embeddings([texts[i] for i in misses])
+        return self._store(keys, embeddings, misses, fresh_embeddings)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        keys, embeddings, misses = self._lookup(texts)
+        if not misses:
+            return embeddings
+        fresh_embeddings = await super()._aget_text_embeddings(
+            [texts[i] for i in misses]
+        )
+        return self._store(keys, embeddings, misses, fresh_embeddings)
+
+
+class LocalFastEmbedEmbedding(FastEmbedEmbedding):
+    """
+    Local FastEmbed (quantized ONNX, CPU) embedding model.
+
+    Features:
+        - Embeds each batch of chunks in a single call instead of one by one
+        - Async embedding runs in a worker thread, off the event loop
+        - No network round-trips or per-token cost
+    """
+
+    def __init__(self, embed_batch_size: int = EMBED_BATCH_SIZE, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.embed_batch_size = embed_batch_size
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "LocalFastEmbedEmbedding"
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        embed = (
+            self._model.passage_embed
+            if self.doc_embed_type == "passage"
+            else self._model.embed
+        )
+        return [embedding.tolist() for embedding in embed(texts)]
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(self._get_text_embeddings, texts)
+
+
+@lru_cache(maxsize=1)
+def get_fastembed_model_singleton() -> LocalFastEmbedEmbedding:
+    """
+    Get or create the local FastEmbed model.
+
+    Note:
+        Loading the ONNX model is expensive, so it's only done once per process.
+    """
+    return LocalFastEmbedEmbedding(model_name=settings.FASTEMBED_MODEL_NAME)
+
+
+def get_embedding_dim() -> int:
+    """
+    Returns the vector dimension of the configured embedding backend.
+    """
+    if settings.EMBEDDING_BACKEND == "fastembed":
+        return FASTEMBED_EMBED_DIMS[settings.FASTEMBED_MODEL_NAME]
+    return OPENAI_EMBED_DIM
@@ -1,43 +1,38 @@
-from app.clinical.document_processor import GuidelineProcessor
-from typing import Dict, List, Optional
+from app.clinical.document_processor import get_pdf_parse_pool, process_pdf_bytes
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
 import logging
-from pathlib import Path
+from contextvars import ContextVar
+from functools import lru_cache
+from operator import attrgetter
 from datetime import datetime
-import s3fs
 from fsspec.asyn import AsyncFileSystem
 from llama_index import (
     ServiceContext,
     VectorStoreIndex,
     StorageContext,
+    load_index_from_storage,
     load_indices_from_storage,
     Document,
 )
 from llama_index.vector_stores.types import VectorStore, MetadataFilters, ExactMatchFilter
-from tempfile import TemporaryDirectory
-import requests
-import nest_asyncio
 from datetime import timedelta
-from cachetools import cached, TTLCache
-from llama_index.readers.file.docs_reader import PDFReader
-from llama_index.schema import Document as LlamaIndexDocument
-from llama_index.llms import ChatMessage, OpenAI
+from cachetools import cached, LRUCache, TTLCache
+from cachetools.keys import hashkey
+from llama_index.llms import ChatMessage
 from llama_index.embeddings.base import BaseEmbedding
+from llama_index.indices.utils import async_embed_nodes
+from llama_index.ingestion.pipeline import run_transformations
 from llama_index.embeddings.openai import (
-    OpenAIEmbedding,
     OpenAIEmbeddingMode,
     OpenAIEmbeddingModelType,
 )
 from llama_index.llms.base import MessageRole
 from llama_index.callbacks.base import BaseCallbackHandler, CallbackManager
+from llama_index.callbacks.schema import CBEventType
 from llama_index.tools import QueryEngineTool, ToolMetadata
-from llama_index.query_engine import SubQuestionQueryEngine, RetrieverQueryEngine
-from llama_index.indices.query.base import BaseQueryEngine
-from llama_index.vector_stores.types import (
-    MetadataFilters,
-    ExactMatchFilter,
-)
-from llama_index.node_parser import SentenceSplitter
-from llama_index.agent import OpenAIAgent
+from llama_index.query_engine.retriever_query_engine import RetrieverQueryEngine
 from app.core.config import settings
 from app.schema import (
     Message as MessageSchema,
@@ -49,26 +44,37 @@ from app.schema import (
 from app.models.db import MessageRoleEnum, MessageStatusEnum
 from app.chat.constants import (
     DB_DOC_ID_KEY,
+    CONTENT_HASH_KEY,
     CLINICAL_SYSTEM_MESSAGE,
-    NODE_PARSER_CHUNK_OVERLAP,
-    NODE_PARSER_CHUNK_SIZE
+    EMBED_BATCH_SIZE,
 )
-from app.chat.utils import build_title_for_document
+from app.chat.utils import build_doc_titles, document_cache_key
 from app.chat.pg_vector import get_vector_store_singleton
+from app.chat.embeddings import CachedOpenAIEmbedding, get_fastembed_model_singleton
+from app.chat.cached_query_engine import CachedQueryEngine
+from app.chat.openai_clients import PooledOpenAI
 from app.chat.qa_response_synth import get_clinical_response_synth
 from llama_index.retrievers import VectorIndexRetriever
-from llama_index.response_synthesizers.factory import get_response_synthesizer
+
+if TYPE_CHECKING:
+    # Agent & sub-question modules are heavy and only needed once a chat
+    # engine is built, so they're imported lazily in get_chat_engine
+    from llama_index.agent import OpenAIAgent
 
 logger = logging.getLogger(__name__)
 
 OPENAI_CHAT_LLM_NAME = "gpt-4-1106-preview"
 
-logger.info("Applying nested asyncio patch")
-nest_asyncio.apply()
+if settings.ENABLE_NEST_ASYNCIO:
+    import nest_asyncio
+
+    logger.info("Applying nested asyncio patch")
+    nest_asyncio.apply()
 
 OPENAI_TOOL_LLM_NAME = "gpt-4-1106-preview"
 
 
+@lru_cache(maxsize=1)
 def get_s3_fs() -> AsyncFileSystem:
     """
     Creates and configures an S3 filesystem interface.
@@ -76,81 +82,160 @@ def get_s3_fs() -> AsyncFileSystem:
     Process:
         1. Determines if using LocalStack (development) or real S3 (production)
         2. Creates filesystem with appropriate endpoint and credentials
-        3. Ensures target bucket exists
+        3. Sizes the connection pool, enables TCP keep-alive and retries
+           throttled requests with client-side rate limiting
         4. Returns configured filesystem interface
+
+    Note:
+        Cached, so the filesystem (and its connections) is only built once per
+        process. The bucket itself is checked at startup by ensure_s3_bucket, not here.
     """
+    import s3fs
+
     s3 = s3fs.S3FileSystem(
         key=settings.AWS_KEY,
         secret=settings.AWS_SECRET,
         endpoint_url=settings.S3_ENDPOINT_URL,
+        config_kwargs={
+            "max_pool_connections": settings.S3_MAX_POOL_CONNECTIONS,
+            "tcp_keepalive": True,
+            # Adaptive mode backs off and rate limits the client when S3
+            # throttles (503 SlowDown), instead of retrying at full speed
+            "retries": {"mode": "adaptive", "max_attempts": 5},
+        },
     )
-    if not (settings.RENDER or s3.exists(settings.S3_BUCKET_NAME)):
-        s3.mkdir(settings.S3_BUCKET_NAME)
+    # botocore does the retrying, so make a single pass through s3fs' own
+    # retry loop rather than multiplying the attempts (up to 5 x 5) per call.
+    # Set on the instance since this s3fs version doesn't take it as an argument
+    s3.retries = 1
     return s3
 
 
-def fetch_and_read_document(
+def ensure_s3_bucket() -> None:
+    """
+    Ensures the storage context bucket exists, creating it if needed.
+    
+    Note:
+        Run once at application startup (and by the seed scripts) since the
+        bucket's existence doesn't change afterwards.
+    """
+    if settings.RENDER:
+        return
+    s3 = get_s3_fs()
+    if not s3.exists(settings.S3_BUCKET_NAME):
+        logger.info("Creating S3 bucket %s", settings.S3_BUCKET_NAME)
+        s3.mkdir(settings.S3_BUCKET_NAME)
+
+
+async def await_s3_coroutine(s3: AsyncFileSystem, coro):
+    """
+    Awaits an s3fs coroutine on the filesystem's own IO loop so the download
+    doesn't block (or get tangled up with) the caller's event loop.
+    """
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, s3.loop))
+
+
+async def download_document(document: DocumentSchema) -> bytes:
+    """
+    Downloads a clinical guideline document from S3 into memory.
+    
+    Process:
+        1. Resolves the S3 path from the document URL
+        2. Fetches the whole object in one request via s3fs' async API
+        3. Returns the raw PDF bytes
+    """
+    # Use the existing S3 filesystem initialization
+    s3 = get_s3_fs()
+    
+    # Get the bucket and key from the URL
+    # URL format: http://localstack:4566/clinical-guidelines-assets/ehae178.pdf
+    bucket = settings.S3_ASSET_BUCKET_NAME
+    key = document.url.split('/')[-1]
+    s3_path = f"{bucket}/{key}"
+    
+    logger.debug("Downloading %s from S3", s3_path)
+    try:
+        return await await_s3_coroutine(s3, s3._cat_file(s3_path))
+    except Exception as e:
+        logger.error(
+            "Error downloading %s from S3 (endpoint %s, bucket %s, key %s): %s",
+            s3_path,
+            settings.S3_ENDPOINT_URL,
+            bucket,
+            key,
+            e,
+        )
+        raise
+
+
+def get_content_hash(data: bytes) -> str:
+    """
+    Hashes a document's raw bytes, used to detect unchanged documents on re-index.
+    """
+    return hashlib.blake2b(data).hexdigest()
+
+
+def is_document_unchanged(
+    storage_context: StorageContext, doc_id: str, content_hash: str
+) -> bool:
+    """
+    Checks whether a document already has an index built from identical content.
+    """
+    stored_document = storage_context.docstore.get_document(doc_id, raise_error=False)
+    return (
+        stored_document is not None
+        and stored_document.metadata.get(CONTENT_HASH_KEY) == content_hash
+        and storage_context.index_store.get_index_struct(doc_id) is not None
+    )
+
+
+async def fetch_and_read_document(
     document: DocumentSchema,
+    data: Optional[bytes] = None,
 ) -> List[Document]:
     """
     Downloads and processes a clinical guideline document from S3 into indexable documents.
     
     Process:
-        1. Downloads document from S3 to temporary directory
+        1. Downloads document from S3 into memory (non-blocking), unless
+           already prefetched bytes are passed in
         2. Uses GuidelineProcessor with specialized chunking
-        3. Adds clinical metadata to each chunk
+        3. Adds clinical metadata and the content hash to each chunk
         4. Returns list of processed documents
     """
-    with TemporaryDirectory() as temp_dir:
-        temp_file_path = Path(temp_dir) / f"{str(document.id)}.pdf"
-        
-        # Use the existing S3 filesystem initialization
-        s3 = get_s3_fs()
-        
-        # Get the bucket and key from the URL
-        # URL format: http://localstack:4566/clinical-guidelines-assets/ehae178.pdf
-        bucket = settings.S3_ASSET_BUCKET_NAME
-        key = document.url.split('/')[-1]
-        s3_path = f"{bucket}/{key}"
-        
-        print(f"Downloading {s3_path} from S3...")
-        try:
-            # Download file from S3 in chunks
-            with s3.open(s3_path, 'rb') as s3_file, open(temp_file_path, 'wb') as local_file:
-                while True:
-                    chunk = s3_file.read(8192)  # Read in 8KB chunks
-                    if not chunk:
-                        break
-                    local_file.write(chunk)
-        except Exception as e:
-            print(f"Error downloading from S3: {e}")
-            print(f"S3 endpoint URL: {settings.S3_ENDPOINT_URL}")
-            print(f"Bucket: {bucket}")
-            print(f"Key: {key}")
-            raise
-
-        # Process clinical guideline
-        from app.clinical.document_processor import GuidelineProcessor
-        processor = GuidelineProcessor()
-        nodes = processor.process_document(
-            temp_file_path,
-            metadata={
-                DB_DOC_ID_KEY: str(document.id),
-                DocumentMetadataKeysEnum.CLINICAL_GUIDELINE: document.metadata_map[DocumentMetadataKeysEnum.CLINICAL_GUIDELINE]
-            }
+    if data is None:
+        data = await download_document(document)
+    content_hash = get_content_hash(data)
+
+    # Process clinical guideline straight from memory, no temp file round-trip.
+    # PDF parsing is CPU bound, so it runs on the process pool: off the event
+    # loop, and spread across cores when several documents are ingested
+    nodes = await asyncio.get_running_loop().run_in_executor(
+        get_pdf_parse_pool(),
+        process_pdf_bytes,
+        data,
+        {
+            DB_DOC_ID_KEY: str(document.id),
+            DocumentMetadataKeysEnum.CLINICAL_GUIDELINE: document.metadata_map[DocumentMetadataKeysEnum.CLINICAL_GUIDELINE]
+        },
+        f"{str(document.id)}.pdf",
+    )
+    
+    # Convert nodes to documents. The content hash is bookkeeping only,
+    # so it's kept out of the text that gets embedded or sent to the LLM
+    return [
+        Document(
+            text=node.text,
+            doc_id=str(document.id),
+            metadata={**(node.metadata or {}), CONTENT_HASH_KEY: content_hash},
+            excluded_embed_metadata_keys=[CONTENT_HASH_KEY],
+            excluded_llm_metadata_keys=[CONTENT_HASH_KEY],
         )
-        
-        # Convert nodes to documents
-        return [
-            Document(
-                text=node.text,
-                doc_id=str(document.id),
-                metadata=node.metadata or {}
-            )
-            for node in nodes
-        ]
+        for node in nodes
+    ]
 
 
+@cached(LRUCache(maxsize=1024), key=document_cache_key)
 def build_description_for_document(document: DocumentSchema) -> str:
     """
     Creates a human-readable description of a document for the chat interface.
@@ -161,6 +246,7 @@ def build_description_for_document(document: DocumentSchema) -> str:
            - Extracts title and issuing organization
            - Formats as medical guideline description
         3. Falls back to basic description if metadata missing
+        4. Caches the result per document id/updated_at/metadata
     """
     
     if DocumentMetadataKeysEnum.CLINICAL_GUIDELINE in document.metadata_map:
@@ -179,29 +265,30 @@ def get_chat_history(
     Prepares chat history for the LLM conversation.
     
     Process:
-        1. Filters out failed messages
+        1. Filters out failed and empty messages
         2. Sorts messages by creation time
-        3. Converts to LlamaIndex ChatMessage format
-        4. Preserves user/assistant roles
+        3. Converts to LlamaIndex ChatMessage format, preserving user/assistant roles
+        Filtering and conversion are fused into the sort, in one pass
     """
-    # pre-process chat messages
-    chat_messages = [
-        m for m in chat_messages
-        if m.content.strip() and m.status == MessageStatusEnum.SUCCESS
-    ]
-    # TODO: could be a source of high CPU utilization
-    chat_messages = sorted(chat_messages, key=lambda m: m.created_at)
-
-    chat_history = []
-    for message in chat_messages:
-        role = (
-            MessageRole.ASSISTANT
-            if message.role == MessageRoleEnum.assistant
-            else MessageRole.USER
+    # Conversation.messages is ordered by created_at in the DB, so sorted()
+    # is a single linear pass here and only guards against unordered input
+    return [
+        ChatMessage(
+            content=message.content,
+            role=(
+                MessageRole.ASSISTANT
+                if message.role == MessageRoleEnum.assistant
+                else MessageRole.USER
+            ),
         )
-        chat_history.append(ChatMessage(content=message.content, role=role))
-
-    return chat_history
+        for message in sorted(
+            (
+                m for m in chat_messages
+                if m.status == MessageStatusEnum.SUCCESS and m.content.strip()
+            ),
+            key=attrgetter("created_at"),
+        )
+    ]
 
 
 def get_embedding_model(document_type: str = None) -> BaseEmbedding:
@@ -210,15 +297,21 @@ def get_embedding_model(document_type: str = None) -> BaseEmbedding:
     
     Process:
         1. Determines document category (clinical/financial)
-        2. Configures embedding parameters:
+        2. Uses the shared local FastEmbed model if EMBEDDING_BACKEND is "fastembed"
+        3. Otherwise configures OpenAI embedding parameters:
            - Model type (text-embedding-ada-002)
            - Mode (text-search for documents)
            - Dimensions and other settings
-        3. Returns configured embedding model
+           - Batch size (chunks per API request)
+        4. Wraps it with the on-disk embedding cache
+        5. Returns configured embedding model
     """
-    return OpenAIEmbedding(
+    if settings.EMBEDDING_BACKEND == "fastembed":
+        return get_fastembed_model_singleton()
+    return CachedOpenAIEmbedding(
         mode=OpenAIEmbeddingMode.SIMILARITY_MODE,
         model_type=OpenAIEmbeddingModelType.TEXT_EMBED_ADA_002,
+        embed_batch_size=EMBED_BATCH_SIZE,
     )
 
 
@@ -234,7 +327,7 @@ def get_tool_service_context(
         3. Creates embedding model
         4. Returns context with all configurations
     """
-    llm = OpenAI(
+    llm = PooledOpenAI(
         model=settings.MODEL_NAME,
         temperature=0.1,
         api_key=settings.OPENAI_API_KEY,
@@ -251,6 +344,40 @@ def get_tool_service_context(
     )
 
 
+async def abuild_index_from_documents(
+    documents: List[Document],
+    storage_context: StorageContext,
+    service_context: ServiceContext,
+) -> VectorStoreIndex:
+    """
+    Async counterpart of VectorStoreIndex.from_documents(..., use_async=True).
+    
+    Process:
+        1. Records document hashes and parses documents into nodes
+        2. Embeds the nodes concurrently by awaiting on the running event loop
+        3. Builds the index from the already-embedded nodes
+
+    Note:
+        from_documents(use_async=True) runs its embedding tasks with
+        run_until_complete, which only works inside a running loop when
+        nest_asyncio is applied. Awaiting the embeddings here avoids that.
+    """
+    with service_context.callback_manager.as_trace("index_construction"):
+        for doc in documents:
+            storage_context.docstore.set_document_hash(doc.get_doc_id(), doc.hash)
+
+        nodes = run_transformations(documents, service_context.transformations)
+        id_to_embed_map = await async_embed_nodes(nodes, service_context.embed_model)
+        for node in nodes:
+            node.embedding = id_to_embed_map[node.node_id]
+
+        return VectorStoreIndex(
+            nodes=nodes,
+            storage_context=storage_context,
+            service_context=service_context,
+        )
+
+
 async def build_doc_id_to_index_map(
     service_context: ServiceContext,
     documents: List[DocumentSchema],
@@ -260,13 +387,14 @@ async def build_doc_id_to_index_map(
     Creates vector store indices for a list of documents.
     
     Process:
-        1. For each document:
-           - Gets appropriate embedding model
-           - Creates document-specific service context
-           - Downloads and processes document into nodes
-           - Creates vector store index
-        2. Caches indices for performance
-        3. Returns mapping of document IDs to indices
+        1. Prefetches every document from S3 concurrently, then parses them
+           into nodes as they arrive (up to INGEST_CONCURRENCY at a time)
+        2. Skips parsing & embedding for documents whose content hash matches
+           their already-stored index, loading that index instead
+        3. As each other document finishes, creates its vector store index
+        4. Adds the indexed documents' nodes to the docstore and persists the
+           storage context once, even if a later document fails
+        5. Returns mapping of document IDs to indices
     """
     persist_dir = f"{settings.S3_BUCKET_NAME}"
     vector_store = await get_vector_store_singleton()
@@ -303,30 +431,84 @@ async def build_doc_id_to_index_map(
         )
         
         doc_id_to_index = {}
-        for doc in documents:
-            # Process document and add to docstore
-            llama_index_docs = fetch_and_read_document(doc)
-            
-            # Set document ID in extra_info for each node
-            for node in llama_index_docs:
-                if not node.extra_info:
-                    node.extra_info = {}
-                node.extra_info["doc_id"] = str(doc.id)
-            
-            storage_context.docstore.add_documents(llama_index_docs)
-            
-            # Create index with both vector store and docstore
-            index = VectorStoreIndex.from_documents(
-                llama_index_docs,
-                storage_context=storage_context,
-                service_context=service_context,
-            )
-            index.set_index_id(str(doc.id))
-            
-            # Persist storage context to S3
-            index.storage_context.persist(persist_dir=persist_dir, fs=fs)
-            doc_id_to_index[str(doc.id)] = index
-            
+        all_llama_index_docs: List[Document] = []
+        semaphore = asyncio.Semaphore(settings.INGEST_CONCURRENCY)
+
+        # Start every S3 download up front, so downloads overlap with the
+        # parsing & embedding of whichever documents arrive first
+        downloads = {
+            str(doc.id): asyncio.ensure_future(download_document(doc))
+            for doc in documents
+        }
+
+        async def fetch_with_limit(doc: DocumentSchema) -> Optional[List[Document]]:
+            data = await downloads[str(doc.id)]
+            if is_document_unchanged(storage_context, str(doc.id), get_content_hash(data)):
+                return None
+            # Only the CPU-bound parsing is bounded, not the downloads
+            async with semaphore:
+                return await fetch_and_read_document(doc, data)
+
+        # Parse documents concurrently as their downloads complete
+        fetches = {
+            asyncio.ensure_future(fetch_with_limit(doc)): doc for doc in documents
+        }
+        pending = set(fetches)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Docstore/index writes stay serial, one document at a time,
+                # so concurrent fetches never race on the shared storage context
+                for fetch in done:
+                    doc = fetches[fetch]
+                    llama_index_docs = fetch.result()
+                    if llama_index_docs is None:
+                        # Same content as when it was last indexed, reuse that index
+                        logger.info("Document %s is unchanged, skipping re-indexing", doc.id)
+                        doc_id_to_index[str(doc.id)] = load_index_from_storage(
+                            storage_context,
+                            index_id=str(doc.id),
+                            service_context=service_context,
+                        )
+                        continue
+
+                    # Set document ID in extra_info for each node
+                    for node in llama_index_docs:
+                        if not node.extra_info:
+                            node.extra_info = {}
+                        node.extra_info["doc_id"] = str(doc.id)
+
+                    # Create index with both vector store and docstore.
+                    # Embeds via aget_text_embedding_batch, sending the
+                    # batches concurrently instead of one request at a time
+                    index = await abuild_index_from_documents(
+                        llama_index_docs,
+                        storage_context=storage_context,
+                        service_context=service_context,
+                    )
+                    index.set_index_id(str(doc.id))
+                    doc_id_to_index[str(doc.id)] = index
+                    all_llama_index_docs.extend(llama_index_docs)
+        except BaseException:
+            # Stop the remaining downloads & parses instead of leaving them
+            # running unawaited, then collect them so their errors aren't
+            # reported as never retrieved
+            tasks = [*downloads.values(), *fetches]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            # Add every indexed document's nodes to the docstore and persist the
+            # storage context to S3 once, rather than re-uploading all of it per
+            # document. Runs on failure too: the indexed documents' vectors are
+            # already in the vector store, so their index structs must be saved
+            # or the next call would re-embed them into duplicate rows
+            storage_context.docstore.add_documents(all_llama_index_docs)
+            storage_context.persist(persist_dir=persist_dir, fs=fs)
+
     return doc_id_to_index
 
 
@@ -380,7 +562,12 @@ def index_to_query_engine(
 
 @cached(
     TTLCache(maxsize=10, ttl=timedelta(minutes=5).total_seconds()),
-    key=lambda *args, **kwargs: f"storage_context_{args[0]}",  # Use persist_dir in cache key
+    # Keyed on the store & filesystem identities too, so callers with different
+    # vector stores never share a context. The cached context holds a reference
+    # to its vector store, so that id can't be reused while the entry is live.
+    key=lambda persist_dir, vector_store, fs=None: hashkey(
+        persist_dir, id(vector_store), id(fs)
+    ),
 )
 def get_storage_context(
     persist_dir: str,
@@ -391,7 +578,7 @@ def get_storage_context(
     Creates or retrieves cached storage context.
     
     Process:
-        1. Generates cache key from directory and store
+        1. Generates cache key from directory, vector store and filesystem
         2. Checks TTL cache for existing context
         3. If not found:
            - Creates new context with vector store
@@ -407,25 +594,88 @@ def get_storage_context(
     )
 
 
-async def get_chat_engine(
-    callback_handler: BaseCallbackHandler,
+chat_tools_cache = TTLCache(maxsize=256, ttl=timedelta(minutes=10).total_seconds())
+
+# Callback handler of the chat turn being served in the current task/context
+current_callback_handler: ContextVar[Optional[BaseCallbackHandler]] = ContextVar(
+    "current_callback_handler", default=None
+)
+
+
+class TurnCallbackHandler(BaseCallbackHandler):
+    """
+    Callback handler for cached conversation tools that forwards every event
+    to the handler of the chat turn currently being served.
+
+    Note:
+        The handler is looked up from current_callback_handler, a ContextVar,
+        so concurrent turns sharing the same cached tools never receive each
+        other's events.
+    """
+
+    def __init__(self) -> None:
+        super().__init__([], [])
+
+    def on_event_start(
+        self,
+        event_type: CBEventType,
+        payload: Optional[Dict[str, Any]] = None,
+        event_id: str = "",
+        parent_id: str = "",
+        **kwargs: Any,
+    ) -> str:
+        handler = current_callback_handler.get()
+        if handler is not None and event_type not in handler.event_starts_to_ignore:
+            handler.on_event_start(
+                event_type, payload, event_id=event_id, parent_id=parent_id, **kwargs
+            )
+        return event_id
+
+    def on_event_end(
+        self,
+        event_type: CBEventType,
+        payload: Optional[Dict[str, Any]] = None,
+        event_id: str = "",
+        **kwargs: Any,
+    ) -> None:
+        handler = current_callback_handler.get()
+        if handler is not None and event_type not in handler.event_ends_to_ignore:
+            handler.on_event_end(event_type, payload, event_id=event_id, **kwargs)
+
+    def start_trace(self, trace_id: Optional[str] = None) -> None:
+        handler = current_callback_handler.get()
+        if handler is not None:
+            handler.start_trace(trace_id)
+
+    def end_trace(
+        self,
+        trace_id: Optional[str] = None,
+        trace_map: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        handler = current_callback_handler.get()
+        if handler is not None:
+            handler.end_trace(trace_id, trace_map)
+
+
+async def build_conversation_tools(
     conversation: ConversationSchema,
-) -> OpenAIAgent:
+) -> Tuple[ServiceContext, List[QueryEngineTool]]:
     """
-    Creates comprehensive chat engine for document-based conversations.
+    Builds the query engine tools for a conversation's documents.
     
     Process:
-        1. Sets up service context with callbacks
+        1. Sets up service context with a TurnCallbackHandler
         2. Initializes S3 filesystem
         3. For each conversation document:
            - Creates vector indices
-           - Builds specialized query engines
+           - Builds specialized query engines (concurrently across documents)
            - Configures document-specific tools
-        4. Sets up chat history and context
-        5. Configures system prompts
-        6. Returns fully configured chat agent
+        4. Fronts the sub-question engine with a response cache
+        5. Returns the service context and top-level tools
     """
-    service_context = get_tool_service_context([callback_handler])
+    from llama_index.query_engine.sub_question_query_engine import SubQuestionQueryEngine
+
+    service_context = get_tool_service_context([TurnCallbackHandler()])
     s3_fs = get_s3_fs()
     doc_id_to_index = await build_doc_id_to_index_map(
         service_context, conversation.documents, fs=s3_fs
@@ -434,15 +684,24 @@ async def get_chat_engine(
         str(doc.id): doc for doc in conversation.documents
     }
 
+    # Build the per-document query engines concurrently
+    query_engines = await asyncio.gather(
+        *[
+            asyncio.to_thread(
+                index_to_query_engine, doc_id, index, conversation.documents
+            )
+            for doc_id, index in doc_id_to_index.items()
+        ]
+    )
     vector_query_engine_tools = [
         QueryEngineTool(
-            query_engine=index_to_query_engine(doc_id, index, conversation.documents),
+            query_engine=query_engine,
             metadata=ToolMetadata(
                 name=doc_id,
                 description=build_description_for_document(id_to_doc[doc_id]),
             ),
         )
-        for doc_id, index in doc_id_to_index.items()
+        for doc_id, query_engine in zip(doc_id_to_index, query_engines)
     ]
 
     response_synth = get_clinical_response_synth(service_context, conversation.documents)
@@ -454,6 +713,12 @@ async def get_chat_engine(
         verbose=settings.VERBOSE,
         use_async=True,
     )
+    if settings.QUERY_CACHE_ENABLED:
+        clinical_query_engine = CachedQueryEngine(
+            clinical_query_engine,
+            doc_ids=id_to_doc.keys(),
+            model_name=settings.MODEL_NAME,
+        )
 
     top_level_tools = [
         QueryEngineTool(
@@ -471,7 +736,80 @@ A query engine specialized for analyzing clinical practice guidelines. Use this
         ),
     ]
 
-    chat_llm = OpenAI(
+    return service_context, top_level_tools
+
+
+async def get_conversation_tools(
+    conversation: ConversationSchema,
+) -> Tuple[ServiceContext, List[QueryEngineTool]]:
+    """
+    Gets the conversation's tools from the cache, building them if needed.
+    
+    Process:
+        1. Generates cache key from conversation id and its document ids
+        2. Starts building the tools if not cached (or already being built)
+        3. Drops failed builds from the cache so the next turn retries
+        4. Returns the service context and top-level tools
+
+    Note:
+        The in-flight build itself is cached, so a warm-up and the first chat
+        turn share one build. It's shielded so a cancelled turn (e.g. a client
+        disconnect) doesn't cancel the build for others.
+    """
+    key = hashkey(
+        str(conversation.id),
+        tuple(sorted(str(doc.id) for doc in conversation.documents)),
+    )
+    tools_future = chat_tools_cache.get(key)
+    if tools_future is None:
+        tools_future = asyncio.ensure_future(build_conversation_tools(conversation))
+        chat_tools_cache[key] = tools_future
+
+        def evict_failed_build(future: asyncio.Future) -> None:
+            # Runs even if every awaiting turn was cancelled, and retrieves
+            # the exception so it isn't reported as never retrieved
+            if future.cancelled() or future.exception() is not None:
+                if chat_tools_cache.get(key) is future:
+                    chat_tools_cache.pop(key, None)
+
+        tools_future.add_done_callback(evict_failed_build)
+    return await asyncio.shield(tools_future)
+
+
+async def warm_chat_engine(conversation: ConversationSchema) -> None:
+    """
+    Builds & caches a conversation's tools ahead of its first chat message.
+    """
+    try:
+        await get_conversation_tools(conversation)
+    except Exception:
+        logger.exception("Failed to warm chat engine for conversation %s", conversation.id)
+
+
+async def get_chat_engine(
+    callback_handler: BaseCallbackHandler,
+    conversation: ConversationSchema,
+) -> "OpenAIAgent":
+    """
+    Creates comprehensive chat engine for document-based conversations.
+    
+    Process:
+        1. Routes this turn's callback events to callback_handler
+        2. Gets the conversation's (cached) query engine tools
+        3. Sets up chat history and context
+        4. Configures system prompts
+        5. Returns fully configured chat agent
+
+    Note:
+        The callback handler is bound to the calling task's context, so it
+        receives the events of everything awaited by the caller afterwards.
+    """
+    from llama_index.agent import OpenAIAgent
+
+    current_callback_handler.set(callback_handler)
+    service_context, top_level_tools = await get_conversation_tools(conversation)
+
+    chat_llm = PooledOpenAI(
         temperature=0,
         model=OPENAI_CHAT_LLM_NAME,
         streaming=True,
@@ -481,12 +819,7 @@ A query engine specialized for analyzing clinical practice guidelines. Use this
     chat_history = get_chat_history(chat_messages)
     logger.debug("Chat history: %s", chat_history)
 
-    if conversation.documents:
-        doc_titles = "\n".join(
-            "- " + build_title_for_document(doc) for doc in conversation.documents
-        )
-    else:
-        doc_titles = "No clinical guidelines selected."
+    doc_titles = build_doc_titles(conversation.documents)
 
     curr_date = datetime.utcnow().strftime("%Y-%m-%d")
     chat_engine = OpenAIAgent.from_tools(
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
 import asyncio
 import logging
 from uuid import uuid4
@@ -7,8 +7,6 @@ from anyio.streams.memory import MemoryObjectSendStream
 
 from llama_index.callbacks.base import BaseCallbackHandler
 from llama_index.callbacks.schema import CBEventType, EventPayload
-from llama_index.query_engine.sub_question_query_engine import SubQuestionAnswerPair
-from llama_index.agent.openai_agent import StreamingAgentChatResponse
 from pydantic import BaseModel
 
 from app import schema
@@ -16,6 +14,10 @@ from app.schema import SubProcessMetadataKeysEnum, SubProcessMetadataMap
 from app.models.db import MessageSubProcessSourceEnum
 from app.chat.engine import get_chat_engine
 
+if TYPE_CHECKING:
+    from llama_index.query_engine.sub_question_query_engine import SubQuestionAnswerPair
+    from llama_index.agent.openai_agent import StreamingAgentChatResponse
+
 logger = logging.getLogger(__name__)
 
 
@@ -80,7 +82,7 @@ class ChatCallbackHandler(BaseCallbackHandler):
             event_type == CBEventType.SUB_QUESTION
             and EventPayload.SUB_QUESTION in payload
         ):
-            sub_q: SubQuestionAnswerPair = payload[EventPayload.SUB_QUESTION]
+            sub_q: "SubQuestionAnswerPair" = payload[EventPayload.SUB_QUESTION]
             metadata_map[
                 SubProcessMetadataKeysEnum.SUB_QUESTION.value
             ] = schema.QuestionAnswerPair.from_sub_question_answer_pair(sub_q).dict()
@@ -148,7 +150,7 @@ Remember - if I have asked a relevant clinical question, I'm counting on you to
 
 {user_message.content}
         """.strip()
-        streaming_chat_response: StreamingAgentChatResponse = (
+        streaming_chat_response: "StreamingAgentChatResponse" = (
             await chat_engine.astream_chat(templated_message)
         )
         response_str = ""
@@ -0,0 +1,67 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+import httpx
+from openai import AsyncOpenAI, OpenAI as SyncOpenAI
+from llama_index.llms import OpenAI
+
+HTTP_POOL_LIMITS = httpx.Limits(max_keepalive_connections=100, max_connections=200)
+
+
+@lru_cache(maxsize=None)
+def get_shared_openai_clients(
+    api_key: str,
+    base_url: str,
+    max_retries: int,
+    timeout: float,
+) -> Tuple[SyncOpenAI, AsyncOpenAI]:
+    """
+    Get or create OpenAI clients shared by every LLM & embedding model that
+    uses the same credentials.
+
+    Note:
+        llama-index builds fresh clients (and so fresh HTTP connection pools)
+        for every OpenAI/OpenAIEmbedding instance, which we create per chat
+        turn. Sharing them keeps connections to the API warm across requests.
+    """
+    return (
+        SyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=max_retries,
+            timeout=timeout,
+            http_client=httpx.Client(limits=HTTP_POOL_LIMITS, timeout=timeout),
+        ),
+        AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=max_retries,
+            timeout=timeout,
+            http_client=httpx.AsyncClient(limits=HTTP_POOL_LIMITS, timeout=timeout),
+        ),
+    )
+
+
+def get_openai_clients(
+    api_key: str,
+    base_url: str,
+    max_retries: int,
+    timeout: float,
+    default_headers: Optional[dict] = None,
+    http_client: Optional[httpx.Client] = None,
+) -> Optional[Tuple[SyncOpenAI, AsyncOpenAI]]:
+    """
+    Returns the shared clients for these credential kwargs, or None when the
+    caller asked for custom headers/HTTP client and needs clients of its own.
+    """
+    if default_headers or http_client:
+        return None
+    return get_shared_openai_clients(api_key, base_url, max_retries, timeout)
+
+
+class PooledOpenAI(OpenAI):
+    """
+    OpenAI LLM that reuses the shared, connection-pooled OpenAI clients.
+    """
+
+    def _get_clients(self) -> Tuple[SyncOpenAI, AsyncOpenAI]:
+        return get_openai_clients(**self._get_credential_kwargs()) or super()._get_clients()
@@ -6,6 +6,7 @@ import sqlalchemy
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.chat.embeddings import get_embedding_dim
 
 singleton_instance = None
 did_run_setup = False
@@ -127,5 +128,6 @@ async def get_vector_store_singleton() -> VectorStore:
         url.username,
         url.password,
         settings.VECTOR_STORE_TABLE_NAME,
+        embed_dim=get_embedding_dim(),
     )
     return singleton_instance
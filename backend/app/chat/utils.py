@@ -1,3 +1,9 @@
+from typing import List
+from threading import Lock
+import hashlib
+import orjson
+from cachetools import cached, LRUCache
+from cachetools.keys import hashkey
 from app.schema import (
     Document as DocumentSchema,
     DocumentMetadataKeysEnum,
@@ -5,6 +11,23 @@ from app.schema import (
 )
 
 
+def document_cache_key(document: DocumentSchema):
+    """
+    Hashable cache key for a document.
+    Includes a hash of its metadata, since upserts update metadata_map
+    without touching updated_at.
+    """
+    metadata_hash = hashlib.blake2b(
+        orjson.dumps(
+            document.metadata_map,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        )
+    ).hexdigest()
+    return hashkey(document.id, document.url, document.updated_at, metadata_hash)
+
+
+# Locked since titles are also built from worker threads (see index_to_query_engine)
+@cached(LRUCache(maxsize=1024), key=document_cache_key, lock=Lock())
 def build_title_for_document(document: DocumentSchema) -> str:
     if DocumentMetadataKeysEnum.CLINICAL_GUIDELINE not in document.metadata_map:
         return "No Title Document"
@@ -13,4 +36,16 @@ def build_title_for_document(document: DocumentSchema) -> str:
         document.metadata_map[DocumentMetadataKeysEnum.CLINICAL_GUIDELINE]
     )
     
-    return f"{clinical_metadata.title}-{clinical_metadata.issuing_organization}"
\ No newline at end of file
+    return f"{clinical_metadata.title}-{clinical_metadata.issuing_organization}"
+
+
+@cached(
+    LRUCache(maxsize=256),
+    key=lambda documents: hashkey(*(document_cache_key(doc) for doc in documents)),
+    lock=Lock(),
+)
+def build_doc_titles(documents: List[DocumentSchema]) -> str:
+    """Bulleted list of document titles for the chat system prompt."""
+    if not documents:
+        return "No clinical guidelines selected."
+    return "\n".join("- " + build_title_for_document(doc) for doc in documents)
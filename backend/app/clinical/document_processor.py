@@ -2,13 +2,20 @@
 Clinical guideline document processor using LlamaIndex.
 Handles the parsing and chunking of clinical guideline PDFs into indexable nodes.
 """
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import BinaryIO, Dict, List, Optional, Any, Union
+
+import pypdf
 
 from llama_index.readers import PDFReader
 from llama_index.schema import Document as LlamaIndexDocument
 from llama_index.node_parser import SentenceSplitter
 
+from app.core.config import settings
 from app.schema import DocumentMetadataKeysEnum, EvidenceGradeEnum
 
 
@@ -39,16 +46,36 @@ class GuidelineProcessor:
             chunk_overlap=20  # Keep the reduced overlap for less redundancy
         )
     
+    def _read_pdf_stream(
+        self,
+        pdf_file: BinaryIO,
+        file_name: Optional[str] = None
+    ) -> List[LlamaIndexDocument]:
+        """
+        Read an in-memory PDF into one document per page.
+        Mirrors PDFReader.load_data, which only accepts paths on disk.
+        """
+        pdf = pypdf.PdfReader(pdf_file)
+        return [
+            LlamaIndexDocument(
+                text=page.extract_text(),
+                metadata={"page_label": pdf.page_labels[i], "file_name": file_name},
+            )
+            for i, page in enumerate(pdf.pages)
+        ]
+
     def process_document(
         self,
-        file_path: Path,
-        metadata: Dict[str, Any]
+        pdf_file: Union[Path, BinaryIO],
+        metadata: Dict[str, Any],
+        file_name: Optional[str] = None
     ) -> List[LlamaIndexDocument]:
         """
         Process a clinical guideline document into searchable chunks.
         
         Process:
-            1. Reads PDF into raw document objects
+            1. Reads PDF (a path, or a file-like object already in memory)
+               into raw document objects
             2. Extracts clinical guideline metadata
             3. For each document section:
                - Adds metadata (title, org, date)
@@ -57,7 +84,10 @@ class GuidelineProcessor:
             4. Returns list of processed nodes
         """
         # Read the PDF file
-        raw_docs = self.reader.load_data(file_path)
+        if isinstance(pdf_file, Path):
+            raw_docs = self.reader.load_data(pdf_file)
+        else:
+            raw_docs = self._read_pdf_stream(pdf_file, file_name)
         
         # Extract guideline metadata
         guideline_metadata = metadata.get(DocumentMetadataKeysEnum.CLINICAL_GUIDELINE, {})
@@ -79,3 +109,33 @@ class GuidelineProcessor:
             nodes.extend(sub_nodes)
         
         return nodes
+
+
+@lru_cache(maxsize=1)
+def get_pdf_parse_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for CPU-bound PDF parsing & chunking.
+    
+    Note:
+        Created lazily so that only processes which actually ingest documents
+        pay for the worker processes. Workers are spawned rather than forked
+        since the parent already runs event loop and fsspec IO threads.
+    """
+    return ProcessPoolExecutor(
+        max_workers=settings.PDF_PARSE_WORKER_COUNT,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def process_pdf_bytes(
+    data: bytes,
+    metadata: Dict[str, Any],
+    file_name: Optional[str] = None
+) -> List[LlamaIndexDocument]:
+    """
+    Process an in-memory PDF into chunks.
+    Module-level so it can be pickled and run on the PDF parse pool.
+    """
+    return GuidelineProcessor().process_document(
+        BytesIO(data), metadata=metadata, file_name=file_name
+    )
@@ -84,6 +84,24 @@ class Settings(PreviewPrefixedSettings):
     # "http://localhost:8080", "http://local.dockertoolbox.tiangolo.com"]'
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
     MODEL_NAME: str = "gpt-4-1106-preview"  # Default to GPT-4
+    INGEST_CONCURRENCY: int = 8  # Max documents fetched & parsed at once during indexing
+    # Processes used for CPU-bound PDF parsing, per uvicorn worker. Each one re-imports
+    # the app & llama_index, so more workers parse faster at the cost of memory.
+    # Unset, the cores are shared between uvicorn workers (see PDF_PARSE_WORKER_COUNT)
+    PDF_PARSE_WORKERS: Optional[int]
+    S3_UPLOAD_CONCURRENCY: int = 16  # Concurrent file uploads when seeding S3
+    S3_MAX_POOL_CONNECTIONS: int = 64  # Kept-alive connections in the shared S3 client pool
+    EMBEDDING_CACHE_DIR: str = ".cache/embeddings"
+    # "openai" or "fastembed" (local ONNX model, needs the fastembed extra).
+    # Used for both ingest & queries, so changing it requires re-seeding a fresh vector table
+    EMBEDDING_BACKEND: str = "openai"
+    FASTEMBED_MODEL_NAME: str = "BAAI/bge-small-en-v1.5"
+    # Patches the event loop to allow nested run_until_complete calls. Only needed
+    # for llama_index code that runs async work from sync code inside a running loop
+    ENABLE_NEST_ASYNCIO: bool = False
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_MAX_SIZE: int = 1024
+    QUERY_CACHE_TTL_SECONDS: int = 3600
 
     @property
     def VERBOSE(self) -> bool:
@@ -143,6 +161,14 @@ class Settings(PreviewPrefixedSettings):
             raise ValueError("Invalid log level: " + str(v))
         return v
 
+    @validator("EMBEDDING_BACKEND", pre=True)
+    def assemble_embedding_backend(cls, v: str) -> str:
+        """Preprocesses the embedding backend to ensure its validity."""
+        v = v.strip().lower()
+        if v not in ["openai", "fastembed"]:
+            raise ValueError("Invalid embedding backend: " + str(v))
+        return v
+
     @validator("IS_PULL_REQUEST", pre=True)
     def assemble_is_pull_request(cls, v: str) -> bool:
         """Preprocesses the IS_PULL_REQUEST flag.
@@ -175,6 +201,14 @@ class Settings(PreviewPrefixedSettings):
         # so we instead go by the number of server instances that can be run given the memory
         return 3
 
+    @property
+    def PDF_PARSE_WORKER_COUNT(self) -> int:
+        if self.PDF_PARSE_WORKERS:
+            return self.PDF_PARSE_WORKERS
+        # Every uvicorn worker starts its own parse pool, so split the cores between
+        # them rather than giving each pool all of them (and its memory footprint)
+        return max(1, cpu_count() // self.UVICORN_WORKER_COUNT)
+
     @property
     def SENTRY_SAMPLE_RATE(self) -> float:
         # TODO: before full release, set this to 0.1 for production
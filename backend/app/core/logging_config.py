@@ -0,0 +1,22 @@
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+
+def add_queue_log_handler(log_formatter: logging.Formatter) -> None:
+    """
+    Logs the root logger's records to stdout via a queue.
+
+    Records are handed off to a queue and written to stdout by a listener
+    thread, so logging calls never block on I/O.
+    """
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(log_formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_listener = QueueListener(log_queue, stream_handler)
+    queue_listener.start()
+    atexit.register(queue_listener.stop)
+    logging.getLogger().addHandler(QueueHandler(log_queue))
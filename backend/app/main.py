@@ -1,9 +1,9 @@
 from typing import cast
 import uvicorn
 import logging
-import sys
 import sentry_sdk
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
 from alembic.config import Config
 import alembic.config
@@ -15,9 +15,11 @@ from llama_index.node_parser.text.utils import split_by_sentence_tokenizer
 from app.api.api import api_router
 from app.db.wait_for_db import check_database_connection
 from app.core.config import settings, AppEnvironment
+from app.core.logging_config import add_queue_log_handler
 from app.loader_io import loader_io_router
 from contextlib import asynccontextmanager
 from app.chat.pg_vector import get_vector_store_singleton, CustomPGVectorStore
+from app.chat.engine import ensure_s3_bucket
 
 logger = logging.getLogger(__name__)
 
@@ -36,10 +38,7 @@ def __setup_logging(log_level: str):
     )
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
-
-    stream_handler = logging.StreamHandler(sys.stdout)
-    stream_handler.setFormatter(log_formatter)
-    root_logger.addHandler(stream_handler)
+    add_queue_log_handler(log_formatter)
     logger.info("Set up logging with log level %s", log_level)
 
 
@@ -82,6 +81,9 @@ async def lifespan(app: FastAPI):
     vector_store = cast(CustomPGVectorStore, vector_store)
     await vector_store.run_setup()
 
+    # check the storage context bucket once here rather than on every request
+    ensure_s3_bucket()
+
     try:
         # Some setup is required to initialize the llama-index sentence splitter
         split_by_sentence_tokenizer()
@@ -97,6 +99,7 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_PREFIX}/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 if settings.BACKEND_CORS_ORIGINS:
@@ -54,7 +54,9 @@ class Conversation(Base):
     A conversation with messages and linked documents
     """
 
-    messages = relationship("Message", back_populates="conversation")
+    messages = relationship(
+        "Message", back_populates="conversation", order_by="Message.created_at"
+    )
     conversation_documents = relationship(
         "ConversationDocument", back_populates="conversation"
     )
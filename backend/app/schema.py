@@ -1,14 +1,14 @@
 """
 Pydantic Schemas for the API
 """
+import orjson
 from pydantic import BaseModel, Field, validator
 from enum import Enum
-from typing import List, Optional, Dict, Union, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Union, Any
 from uuid import UUID
 from datetime import datetime
 from llama_index.schema import BaseNode, NodeWithScore
 from llama_index.callbacks.schema import EventPayload
-from llama_index.query_engine.sub_question_query_engine import SubQuestionAnswerPair
 from app.models.db import (
     MessageRoleEnum,
     MessageStatusEnum,
@@ -17,11 +17,22 @@ from app.models.db import (
 )
 from app.chat.constants import DB_DOC_ID_KEY
 
+if TYPE_CHECKING:
+    from llama_index.query_engine.sub_question_query_engine import SubQuestionAnswerPair
+
 
 def build_uuid_validator(*field_names: str):
     return validator(*field_names)(lambda x: str(x) if x else x)
 
 
+def orjson_dumps(v: Any, *, default: Any) -> str:
+    """
+    json_dumps for pydantic models. orjson returns bytes rather than str, and
+    needs OPT_NON_STR_KEYS for the enum keys used in our metadata maps.
+    """
+    return orjson.dumps(v, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class Base(BaseModel):
     id: Optional[UUID] = Field(None, description="Unique identifier")
     created_at: Optional[datetime] = Field(None, description="Creation datetime")
@@ -29,11 +40,16 @@ class Base(BaseModel):
 
     class Config:
         orm_mode = True
+        # .json()/.parse_raw() are on the per-token SSE streaming path
+        json_loads = orjson.loads
+        json_dumps = orjson_dumps
 
 
 class BaseMetadataObject(BaseModel):
     class Config:
         orm_mode = True
+        json_loads = orjson.loads
+        json_dumps = orjson_dumps
 
 
 class Citation(BaseMetadataObject):
@@ -69,7 +85,7 @@ class QuestionAnswerPair(BaseModel):
 
     @classmethod
     def from_sub_question_answer_pair(
-        cls, sub_question_answer_pair: SubQuestionAnswerPair
+        cls, sub_question_answer_pair: "SubQuestionAnswerPair"
     ) -> "QuestionAnswerPair":
         """Create a QuestionAnswerPair from a SubQuestionAnswerPair object"""
         citations = None
@@ -109,7 +125,7 @@ class MessageSubProcess(BaseModel):
         orm_mode = True
 
 
-class Message(BaseModel):
+class Message(Base):
     conversation_id: UUID
     content: str
     role: MessageRoleEnum
@@ -1,163 +1,434 @@
-from typing import List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
 import asyncio
-from tempfile import TemporaryDirectory
+import hashlib
+import logging
+import mimetypes
+import re
 from pathlib import Path
 from fire import Fire
 import s3fs
 from app.core.config import settings, AppEnvironment
+from app.core.logging_config import add_queue_log_handler
+from app.chat.engine import await_s3_coroutine, get_s3_fs
 import seed_storage_context
 import upsert_clinical_documents 
 
+logger = logging.getLogger(__name__)
 
-def copy_to_s3(dir_path: str, s3_bucket: str = settings.S3_ASSET_BUCKET_NAME):
+# Multipart upload tuning for guideline PDFs (typically 1-50 MiB). S3 parts must be
+# at least 5 MiB (except the last) and an upload can have at most 10,000 parts,
+# so 8 MiB parts cover files up to ~78 GiB
+MULTIPART_THRESHOLD = 8 * 2**20
+MULTIPART_CHUNKSIZE = 8 * 2**20
+# Parts in flight per file. Up to S3_UPLOAD_CONCURRENCY files upload at once,
+# so split the connection pool between them rather than queueing extra parts
+# (and their buffers) behind it
+MULTIPART_CONCURRENCY = max(
+    1, settings.S3_MAX_POOL_CONNECTIONS // settings.S3_UPLOAD_CONCURRENCY
+)
+
+# Metadata for the example guidelines used in local development, keyed by filename.
+# Read-only and built once at import
+GUIDELINE_METADATA: Mapping[str, dict] = MappingProxyType({
+    "Euro_Journal_Neurology_Stroke_Guidelines.pdf": {
+        "title": "ESO-EAN Joint Guidelines on Post-Stroke Management",
+        "issuing_organization": "European Stroke Organisation and European Academy of Neurology",
+        "specialty": "Neurology",
+        "evidence_grading_system": "GRADE"
+    },
+    "NCPG_steroids.pdf": {
+        "title": "Antenatal Corticosteroids Guidelines",
+        "issuing_organization": "NCPG",
+        "specialty": "Obstetrics",
+        "evidence_grading_system": "GRADE"
+    },
+    "decompensated-cirrhosis-English-report.pdf": {
+        "title": "Decompensated Cirrhosis Management Guidelines",
+        "issuing_organization": "British Society of Gastroenterology",
+        "specialty": "Gastroenterology",
+        "evidence_grading_system": "GRADE"
+    },
+    "ehae178.pdf": {
+        "title": "EASL Clinical Practice Guidelines",
+        "issuing_organization": "European Association for the Study of the Liver",
+        "specialty": "Hepatology",
+        "evidence_grading_system": "GRADE"
+    },
+    "joint-replacement-primary-hip-knee-and-shoulder-pdf-66141845322181.pdf": {
+        "title": "Joint Replacement Guidelines",
+        "issuing_organization": "NICE",
+        "specialty": "Orthopedics",
+        "evidence_grading_system": "GRADE"
+    }
+})
+
+# Guideline filenames in the S3 assets bucket, optionally versioned, e.g.
+# "NICE_hip_replacement_v2.pdf"
+GUIDELINE_FILENAME_RE = re.compile(r"^(?P<title>.+?)(?:_v(?P<version>\d+))?\.pdf$")
+
+
+def setup_logging(log_level: str):
     """
-    Copy all files in dir_path to S3.
+    Sets up logging for the seed, through a queue so the upload coroutines
+    never block on stdout.
     """
-    print(f"Initializing S3 connection to {settings.S3_ENDPOINT_URL}")
-    s3 = s3fs.S3FileSystem(
-        key=settings.AWS_KEY,
-        secret=settings.AWS_SECRET,
-        endpoint_url=settings.S3_ENDPOINT_URL,
+    log_level = getattr(logging, log_level.upper())
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    # The AWS clients log every request at DEBUG, drowning out the seed's own output
+    for name in ("botocore", "aiobotocore", "s3fs"):
+        logging.getLogger(name).setLevel(max(log_level, logging.INFO))
+    add_queue_log_handler(
+        logging.Formatter("%(asctime)s [%(levelname)-5.5s]  %(message)s")
     )
 
-    print(f"Checking if bucket {s3_bucket} exists...")
-    if not (settings.RENDER or s3.exists(s3_bucket)):
-        print(f"Bucket {s3_bucket} does not exist, creating it...")
+
+async def gather_or_cancel(*coros) -> list:
+    """
+    Like asyncio.gather, but cancels the remaining tasks as soon as one fails
+    instead of leaving them running (what asyncio.TaskGroup does on 3.11+).
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+def read_file_part(file_path: Path, offset: int, buffer: bytearray) -> int:
+    """
+    Read the part of a file starting at offset into buffer, returning the
+    number of bytes read.
+    """
+    with file_path.open("rb") as f:
+        f.seek(offset)
+        return f.readinto(buffer)
+
+
+async def put_file(s3: s3fs.S3FileSystem, file_path: Path, s3_path: str) -> None:
+    """
+    Upload a file to S3, sending files over MULTIPART_THRESHOLD as a
+    multipart upload with up to MULTIPART_CONCURRENCY parts in flight.
+    Multipart files are streamed from disk, so memory use is bounded by the
+    part buffers rather than the file size.
+
+    Note:
+        s3fs' own _put_file only switches to multipart above 2x its 50 MiB
+        chunksize and then uploads the parts one at a time.
+        Must run on the filesystem's IO loop, see await_s3_coroutine.
+    """
+    bucket, key, _ = s3.split_path(s3_path)
+    size = file_path.stat().st_size
+    content_type, _ = mimetypes.guess_type(file_path.name)
+    extra_args = {"ContentType": content_type} if content_type else {}
+
+    if size < MULTIPART_THRESHOLD:
+        # Read off the IO loop into bytes, which s3fs can safely re-send if it
+        # retries the call (a file handle would already be at EOF)
+        body = await asyncio.to_thread(file_path.read_bytes)
+        await s3._call_s3(
+            "put_object", Bucket=bucket, Key=key, Body=body, **extra_args
+        )
+    else:
+        mpu = await s3._call_s3(
+            "create_multipart_upload", Bucket=bucket, Key=key, **extra_args
+        )
+        part_offsets = range(0, size, MULTIPART_CHUNKSIZE)
+
+        # One reusable buffer per in-flight part; taking a buffer from the
+        # pool also bounds how many parts upload at once
+        buffers: asyncio.Queue = asyncio.Queue()
+        for _ in range(min(MULTIPART_CONCURRENCY, len(part_offsets))):
+            buffers.put_nowait(bytearray(MULTIPART_CHUNKSIZE))
+
+        async def upload_part(part_number: int, offset: int) -> dict:
+            buffer = await buffers.get()
+            try:
+                # Read off the IO loop, it's shared by all in-flight uploads
+                size_read = await asyncio.to_thread(
+                    read_file_part, file_path, offset, buffer
+                )
+                part = await s3._call_s3(
+                    "upload_part",
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=mpu["UploadId"],
+                    PartNumber=part_number,
+                    Body=buffer if size_read == len(buffer) else buffer[:size_read],
+                )
+            finally:
+                buffers.put_nowait(buffer)
+            return {"PartNumber": part_number, "ETag": part["ETag"]}
+
+        try:
+            parts = await asyncio.gather(
+                *[
+                    upload_part(part_number, offset)
+                    for part_number, offset in enumerate(part_offsets, start=1)
+                ]
+            )
+            await s3._call_s3(
+                "complete_multipart_upload",
+                Bucket=bucket,
+                Key=key,
+                UploadId=mpu["UploadId"],
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            await s3._call_s3(
+                "abort_multipart_upload", Bucket=bucket, Key=key, UploadId=mpu["UploadId"]
+            )
+            raise
+    s3.invalidate_cache(s3_path)
+
+
+async def bucket_exists(s3: s3fs.S3FileSystem, s3_bucket: str) -> bool:
+    """
+    Check whether a bucket exists with a single HeadBucket request.
+    Must run on the filesystem's IO loop, see await_s3_coroutine.
+    """
+    try:
+        await s3._call_s3("head_bucket", Bucket=s3_bucket)
+    except FileNotFoundError:
+        # s3fs translates the 404 ClientError into FileNotFoundError
+        return False
+    return True
+
+
+@lru_cache(maxsize=1024)
+def parse_guideline_filename(filename: str) -> Mapping[str, Optional[str]]:
+    """
+    Build a guideline's metadata from its PDF filename. Cached and read-only,
+    so re-listing the same files doesn't rebuild their metadata.
+    """
+    match = GUIDELINE_FILENAME_RE.match(filename)
+    return MappingProxyType({
+        "title": match["title"],
+        "version": match["version"],
+        "issuing_organization": "Your Organization",  # You might want to extract this from filename or S3 metadata
+        "publication_date": None,  # You might want to get this from S3 metadata
+        "specialty": None,  # You might want to extract this from filename or S3 metadata
+        "evidence_grading_system": None  # You might want to extract this from filename or S3 metadata
+    })
+
+
+def is_local_debug() -> bool:
+    """
+    Whether to run bucket listing diagnostics. A LIST pages through every key in
+    the bucket, so it's only worth it against the small LocalStack buckets.
+    """
+    return settings.ENVIRONMENT == AppEnvironment.LOCAL and settings.LOG_LEVEL == "DEBUG"
+
+
+def file_md5(file_path: Path) -> str:
+    """
+    Hex MD5 of a file, read in chunks so large files aren't loaded whole.
+    """
+    md5 = hashlib.md5()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(MULTIPART_CHUNKSIZE):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+async def needs_upload(s3: s3fs.S3FileSystem, file_path: Path, s3_path: str) -> bool:
+    """
+    Check whether a file differs from its copy in S3, so re-seeds only upload
+    what changed. Must run on the filesystem's IO loop, see await_s3_coroutine.
+
+    Process:
+        1. HEADs the object, which needs uploading if it doesn't exist
+        2. Compares the object's size with the local file's
+        3. For single part uploads, whose ETag is the MD5 of the content,
+           also compares the local file's MD5
+    """
+    bucket, key, _ = s3.split_path(s3_path)
+    try:
+        head = await s3._call_s3("head_object", Bucket=bucket, Key=key)
+    except FileNotFoundError:
+        return True
+
+    if head["ContentLength"] != file_path.stat().st_size:
+        return True
+
+    # Multipart ETags ("<md5 of part md5s>-<part count>") can't be checked
+    # without the part boundaries, so those fall back to the size check
+    etag = head["ETag"].strip('"')
+    if "-" in etag:
+        return False
+    # Hash off the IO loop, it's shared by all in-flight uploads
+    return await asyncio.to_thread(file_md5, file_path) != etag
+
+
+async def copy_to_s3(
+    s3: s3fs.S3FileSystem,
+    dir_path: str,
+    s3_bucket: str = settings.S3_ASSET_BUCKET_NAME,
+    uploaded: Optional[asyncio.Queue] = None,
+):
+    """
+    Copy all files in dir_path to S3.
+
+    If an uploaded queue is given, each file's path is put on it as soon as
+    that file is in S3, followed by None once all uploads are done, so a
+    consumer can process files while the rest are still uploading.
+    """
+    logger.debug("Checking if bucket %s exists...", s3_bucket)
+    if not (
+        settings.RENDER
+        or await await_s3_coroutine(s3, bucket_exists(s3, s3_bucket))
+    ):
+        logger.info("Bucket %s does not exist, creating it...", s3_bucket)
         s3.mkdir(s3_bucket)
     else:
-        print(f"Bucket {s3_bucket} already exists")
-        print("Current contents:")
-        print(s3.ls(s3_bucket))
+        logger.debug("Bucket %s already exists", s3_bucket)
+        # Listing the bucket can take many requests, so only do it when debugging locally
+        if is_local_debug():
+            logger.debug("Current contents: %s", s3.ls(s3_bucket))
 
     # Copy files individually to avoid directory structure issues
     dir_path = Path(dir_path)
-    for file_path in dir_path.glob("*.pdf"):
-        s3_path = f"{s3_bucket}/{file_path.name}"
-        print(f"Copying {file_path} to s3://{s3_path}")
-        s3.put(str(file_path), s3_path)
+    # The uploaded queue belongs to the caller's loop, so uploads running on
+    # the S3 IO loop hand paths back to it thread-safely
+    caller_loop = asyncio.get_running_loop()
+
+    def notify(file_path: Optional[Path]) -> None:
+        if uploaded is not None:
+            caller_loop.call_soon_threadsafe(uploaded.put_nowait, file_path)
 
-    print("Files in bucket after upload:")
-    print(s3.ls(s3_bucket))
+    async def upload_all() -> Tuple[int, int]:
+        uploaded_count = skipped_count = 0
+        # Bounded so the directory scan only runs a little ahead of the uploads
+        upload_q: asyncio.Queue = asyncio.Queue(maxsize=settings.S3_UPLOAD_CONCURRENCY)
+
+        async def produce() -> None:
+            for file_path in upsert_clinical_documents.list_pdfs(dir_path):
+                await upload_q.put(file_path)
+            for _ in range(settings.S3_UPLOAD_CONCURRENCY):
+                await upload_q.put(None)
+
+        async def upload_worker() -> None:
+            nonlocal uploaded_count, skipped_count
+            while (file_path := await upload_q.get()) is not None:
+                s3_path = f"{s3_bucket}/{file_path.name}"
+                if await needs_upload(s3, file_path, s3_path):
+                    logger.debug("Copying %s to s3://%s", file_path, s3_path)
+                    await put_file(s3, file_path, s3_path)
+                    uploaded_count += 1
+                else:
+                    logger.debug("Skipping %s, already in s3://%s", file_path, s3_path)
+                    skipped_count += 1
+                # Hand on skipped files too, their records still get upserted
+                notify(file_path)
+
+        await gather_or_cancel(
+            produce(),
+            *[upload_worker() for _ in range(settings.S3_UPLOAD_CONCURRENCY)],
+        )
+        return uploaded_count, skipped_count
+
+    # Uploads are network bound, so overlap them via s3fs' async API. The
+    # whole batch runs on the filesystem's IO loop in one hand-off, sharing
+    # its pooled connections, rather than hopping threads per file
+    try:
+        uploaded_count, skipped_count = await await_s3_coroutine(s3, upload_all())
+    finally:
+        notify(None)
+
+    logger.info(
+        "Upload complete; %d files uploaded, %d already up to date",
+        uploaded_count,
+        skipped_count,
+    )
+    if is_local_debug():
+        logger.debug("Files in bucket after upload: %s", s3.ls(s3_bucket, refresh=True))
 
 async def async_seed_db(include_clinical: bool = True):
-    with TemporaryDirectory() as temp_dir:
-        if include_clinical:
-            if settings.ENVIRONMENT == AppEnvironment.LOCAL:
-                print("Using example clinical guidelines for local development")
-                example_guidelines_dir = Path("example_guidelines")
-                
-                # Map filenames to metadata
-                guideline_metadata = {
-                    "Euro_Journal_Neurology_Stroke_Guidelines.pdf": {
-                        "title": "ESO-EAN Joint Guidelines on Post-Stroke Management",
-                        "issuing_organization": "European Stroke Organisation and European Academy of Neurology",
-                        "specialty": "Neurology",
-                        "evidence_grading_system": "GRADE"
-                    },
-                    "NCPG_steroids.pdf": {
-                        "title": "Antenatal Corticosteroids Guidelines",
-                        "issuing_organization": "NCPG",
-                        "specialty": "Obstetrics",
-                        "evidence_grading_system": "GRADE"
-                    },
-                    "decompensated-cirrhosis-English-report.pdf": {
-                        "title": "Decompensated Cirrhosis Management Guidelines",
-                        "issuing_organization": "British Society of Gastroenterology",
-                        "specialty": "Gastroenterology",
-                        "evidence_grading_system": "GRADE"
-                    },
-                    "ehae178.pdf": {
-                        "title": "EASL Clinical Practice Guidelines",
-                        "issuing_organization": "European Association for the Study of the Liver",
-                        "specialty": "Hepatology",
-                        "evidence_grading_system": "GRADE"
-                    },
-                    "joint-replacement-primary-hip-knee-and-shoulder-pdf-66141845322181.pdf": {
-                        "title": "Joint Replacement Guidelines",
-                        "issuing_organization": "NICE",
-                        "specialty": "Orthopedics",
-                        "evidence_grading_system": "GRADE"
-                    }
-                }
-
-                # Create metadata list from existing files
-                metadata_list = []
-                for file_path in example_guidelines_dir.glob("*.pdf"):
-                    if file_path.name in guideline_metadata:
-                        metadata = guideline_metadata[file_path.name]
-                        metadata_list.append(metadata)
-
-                print("Copying clinical guidelines to S3")
-                copy_to_s3(str(example_guidelines_dir))
-
-                print("Upserting records of clinical guidelines into database")
-                await upsert_clinical_documents.async_upsert_documents_from_guidelines(
+    logger.info("Initializing S3 connection to %s", settings.S3_ENDPOINT_URL)
+    s3 = get_s3_fs()
+
+    if include_clinical:
+        if settings.ENVIRONMENT == AppEnvironment.LOCAL:
+            logger.info("Using example clinical guidelines for local development")
+            example_guidelines_dir = Path("example_guidelines")
+
+            # Pipeline the seed: each guideline's record is upserted as soon as
+            # its upload finishes, while the remaining files are still uploading
+            logger.info("Copying clinical guidelines to S3 and upserting their records into database")
+            uploaded: asyncio.Queue = asyncio.Queue()
+            await gather_or_cancel(
+                copy_to_s3(s3, str(example_guidelines_dir), uploaded=uploaded),
+                upsert_clinical_documents.async_upsert_documents_from_queue(
+                    uploaded,
+                    metadata_by_name=GUIDELINE_METADATA,
                     url_base=settings.CDN_BASE_URL,
-                    doc_dir=str(example_guidelines_dir),
-                    metadata_list=metadata_list
-                )
+                ),
+            )
 
-                print("Seeding storage context with clinical guidelines")
-                await seed_storage_context.async_main_seed_storage_context()
-                
-                print(
-                    """
+            # Storage context seeding needs both the uploaded files and the DB records
+            logger.info("Seeding storage context with clinical guidelines")
+            await seed_storage_context.async_main_seed_storage_context()
+            
+            logger.info(
+                """
 Done! 🏁
 \t- Example clinical guidelines uploaded to LocalStack S3 ✅
 \t- Documents database table has been populated ✅
 \t- Vector storage table has been seeded with embeddings ✅
-                    """.strip()
-                )
-            else:
-                print("Listing clinical guidelines from S3")
-                s3 = s3fs.S3FileSystem(
-                    key=settings.AWS_KEY,
-                    secret=settings.AWS_SECRET,
-                    endpoint_url=settings.S3_ENDPOINT_URL,
-                )
-                
-                # List clinical guidelines from S3
-                s3_prefix = f"{settings.S3_ASSET_BUCKET_NAME}/clinical-guidelines/"
-                guideline_files = [f for f in s3.ls(s3_prefix) if f.endswith('.pdf')]
-                
-                if not guideline_files:
-                    print("No clinical guidelines found in S3. Please upload some guidelines first.")
-                    return
-                    
-                print(f"Found {len(guideline_files)} clinical guidelines")
-                
-                # Create metadata list from filenames
-                metadata_list = [{
-                    "title": Path(f).stem,
-                    "issuing_organization": "Your Organization",  # You might want to extract this from filename or S3 metadata
-                    "publication_date": None,  # You might want to get this from S3 metadata
-                    "specialty": None,  # You might want to extract this from filename or S3 metadata
-                    "evidence_grading_system": None  # You might want to extract this from filename or S3 metadata
-                } for f in guideline_files]
-                
-                print("Upserting clinical guidelines into database")
-                await upsert_clinical_documents.async_upsert_documents_from_guidelines(
-                    url_base=settings.CDN_BASE_URL,
-                    doc_dir=s3_prefix,
-                    metadata_list=metadata_list
-                )
-                
-                print("Seeding storage context with clinical guidelines")
-                await seed_storage_context.async_main_seed_storage_context()
+                """.strip()
+            )
+        else:
+            logger.info("Listing clinical guidelines from S3")
+            # List clinical guidelines from the root of the assets bucket, where
+            # copy_to_s3 writes them. Document URLs only keep the filename, which
+            # downloads and the /assets endpoint resolve against the bucket root
+            s3_prefix = settings.S3_ASSET_BUCKET_NAME
+            
+            # Create metadata list from filenames
+            guideline_files = [
+                Path(f)
+                for f in await await_s3_coroutine(s3, s3._ls(s3_prefix))
+                if f.endswith('.pdf')
+            ]
+            metadata_list = list(
+                map(parse_guideline_filename, (f.name for f in guideline_files))
+            )
+            
+            if not metadata_list:
+                logger.warning("No clinical guidelines found in S3. Please upload some guidelines first.")
+                return
                 
-                print(
-                    """
+            logger.info("Found %d clinical guidelines", len(metadata_list))
+            
+            logger.info("Upserting clinical guidelines into database")
+            # Documents come from the S3 listing, there's no local directory to scan
+            await upsert_clinical_documents.async_upsert_guideline_documents(
+                guideline_files=guideline_files,
+                metadata_list=metadata_list,
+                url_base=settings.CDN_BASE_URL,
+            )
+            
+            logger.info("Seeding storage context with clinical guidelines")
+            await seed_storage_context.async_main_seed_storage_context()
+            
+            logger.info(
+                """
 Done! 🏁
 \t- Found existing clinical guidelines in S3 assets bucket ✅
 \t- Documents database table has been populated ✅
 \t- Vector storage table has been seeded with embeddings ✅
-                    """.strip()
-                )
-        else:
-            print("Skipping clinical guidelines")
+                """.strip()
+            )
+    else:
+        logger.info("Skipping clinical guidelines")
 
 
 def seed_db(include_clinical: bool = True):
+    setup_logging(settings.LOG_LEVEL)
     asyncio.run(async_seed_db(include_clinical=include_clinical))
 
 if __name__ == "__main__":
@@ -7,11 +7,13 @@ from app.chat.engine import (
     get_tool_service_context,
     build_doc_id_to_index_map,
     get_s3_fs,
+    ensure_s3_bucket,
 )
 
 
 async def async_main_seed_storage_context():
     fs = get_s3_fs()
+    ensure_s3_bucket()
     async with SessionLocal() as db:
         docs = await crud.fetch_documents(db)
     
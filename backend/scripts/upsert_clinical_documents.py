@@ -1,7 +1,9 @@
 from pathlib import Path
+from typing import List, Mapping
 from fire import Fire
-from tqdm import tqdm
 import asyncio
+import logging
+import os
 from fastapi.encoders import jsonable_encoder
 from app.models.db import Document
 from app.schema import (
@@ -14,12 +16,31 @@ from app.db.session import SessionLocal
 from app.api import crud
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_URL_BASE = "http://localhost:4566"  # LocalStack endpoint
 DEFAULT_DOC_DIR = "example_guidelines/"
 
-async def upsert_single_document(doc_dir: str, guideline_file: Path, metadata: dict, url_base: str):
+def list_pdfs(dir_path: str) -> List[Path]:
     """
-    Upsert a single clinical guideline document into the database.
+    List the PDF files directly inside dir_path. scandir checks names and file
+    types from the directory listing itself, without Path.glob's pattern matching.
+    Like glob, a missing directory yields no files.
+    """
+    try:
+        with os.scandir(dir_path) as entries:
+            return [
+                Path(entry.path)
+                for entry in entries
+                if entry.is_file() and entry.name.endswith(".pdf")
+            ]
+    except FileNotFoundError:
+        return []
+
+
+def build_guideline_document(guideline_file: Path, metadata: Mapping, url_base: str) -> DocumentSchema:
+    """
+    Build the document record for a clinical guideline file.
     """
     # Handle URL construction based on environment
     # Strip any trailing slashes from url_base
@@ -31,6 +52,7 @@ async def upsert_single_document(doc_dir: str, guideline_file: Path, metadata: d
         title=metadata.get("title", guideline_file.stem),
         issuing_organization=metadata.get("issuing_organization"),
         publication_date=metadata.get("publication_date"),
+        version=metadata.get("version"),
         specialty=metadata.get("specialty"),
         evidence_grading_system=metadata.get("evidence_grading_system")
     )
@@ -41,7 +63,14 @@ async def upsert_single_document(doc_dir: str, guideline_file: Path, metadata: d
         )
     }
     
-    doc = DocumentSchema(url=str(url_path), metadata_map=metadata_map)
+    return DocumentSchema(url=str(url_path), metadata_map=metadata_map)
+
+
+async def upsert_single_document(doc_dir: str, guideline_file: Path, metadata: dict, url_base: str):
+    """
+    Upsert a single clinical guideline document into the database.
+    """
+    doc = build_guideline_document(guideline_file, metadata, url_base)
     
     async with SessionLocal() as db:
         document = await crud.upsert_document_by_url(db, doc)
@@ -55,21 +84,79 @@ async def async_upsert_documents_from_guidelines(
     """
     Upserts clinical guideline documents into the database.
     """
-    doc_dir_path = Path(doc_dir)
-    guideline_files = list(doc_dir_path.glob("*.pdf"))
+    guideline_files = list_pdfs(doc_dir)
     
-    print(f"Found {len(guideline_files)} clinical guidelines in {doc_dir}")
+    logger.info("Found %d clinical guidelines in %s", len(guideline_files), doc_dir)
     
-    documents = []
-    for guideline_file, metadata in tqdm(
-        zip(guideline_files, metadata_list),
-        total=len(guideline_files),
-        desc="Upserting clinical guidelines"
-    ):
-        document = await upsert_single_document(doc_dir, guideline_file, metadata, url_base)
-        documents.append(document)
-        print(f"Upserted document {guideline_file.name}. Database ID: {document.id}")
+    return await async_upsert_guideline_documents(
+        guideline_files=guideline_files,
+        metadata_list=metadata_list,
+        url_base=url_base,
+    )
+
+async def async_upsert_guideline_documents(
+    guideline_files: List[Path],
+    metadata_list: list,
+    url_base: str,
+):
+    """
+    Upserts documents for the given guideline files, which can be local
+    paths or S3 keys, paired in order with metadata_list.
+    """
+    docs = [
+        build_guideline_document(guideline_file, metadata, url_base)
+        for guideline_file, metadata in zip(guideline_files, metadata_list)
+    ]
     
+    # One multi-row upsert instead of a round-trip per document
+    async with SessionLocal() as db:
+        documents = await crud.upsert_documents_by_url(db, docs)
+    for document in documents:
+        logger.debug("Upserted document %s. Database ID: %s", Path(document.url).name, document.id)
+    logger.info("Upserted %d clinical guideline documents", len(documents))
+    
+    return documents
+
+async def async_upsert_documents_from_queue(
+    uploaded: asyncio.Queue,
+    metadata_by_name: Mapping[str, dict],
+    url_base: str,
+):
+    """
+    Upserts clinical guideline documents as their files arrive on the queue.
+
+    Process:
+        1. Waits for the next guideline file path, stopping at None
+        2. Drains any other paths already queued into the same batch
+        3. Upserts the batch's documents in one multi-row statement
+        4. Repeats until the queue is closed with None
+    Files without an entry in metadata_by_name are skipped.
+    """
+    documents = []
+    done = False
+    while not done:
+        batch = []
+        guideline_file = await uploaded.get()
+        while True:
+            if guideline_file is None:
+                done = True
+                break
+            metadata = metadata_by_name.get(guideline_file.name)
+            if metadata is not None:
+                batch.append(build_guideline_document(guideline_file, metadata, url_base))
+            try:
+                guideline_file = uploaded.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+
+        if batch:
+            async with SessionLocal() as db:
+                upserted = await crud.upsert_documents_by_url(db, batch)
+            for document in upserted:
+                logger.debug("Upserted document %s. Database ID: %s", Path(document.url).name, document.id)
+            documents.extend(upserted)
+
+    logger.info("Upserted %d clinical guideline documents", len(documents))
     return documents
 
 def main_upsert_documents_from_guidelines(
@@ -80,6 +167,7 @@ def main_upsert_documents_from_guidelines(
     """
     Main entry point for upserting clinical guideline documents.
     """
+    logging.basicConfig(level=settings.LOG_LEVEL)
     if metadata_list is None:
         metadata_list = []
     
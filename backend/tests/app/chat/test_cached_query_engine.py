@@ -0,0 +1,51 @@
+from cachetools import TTLCache
+from llama_index.indices.query.base import BaseQueryEngine
+from llama_index.prompts.mixin import PromptMixinType
+from llama_index.response.schema import Response
+from llama_index.schema import QueryBundle
+from app.chat.cached_query_engine import CachedQueryEngine
+
+
+class CountingQueryEngine(BaseQueryEngine):
+    def __init__(self):
+        super().__init__(callback_manager=None)
+        self.calls = 0
+
+    def _get_prompt_modules(self) -> PromptMixinType:
+        return {}
+
+    def _query(self, query_bundle: QueryBundle) -> Response:
+        self.calls += 1
+        return Response(response=f"answer to {query_bundle.query_str}")
+
+    async def _aquery(self, query_bundle: QueryBundle) -> Response:
+        return self._query(query_bundle)
+
+
+class TestCachedQueryEngine:
+    """
+    Test the CachedQueryEngine response cache.
+    """
+
+    def test_repeated_question_is_served_from_cache(self):
+        inner = CountingQueryEngine()
+        engine = CachedQueryEngine(
+            inner, doc_ids=["b", "a"], model_name="gpt-4", cache=TTLCache(10, 60)
+        )
+        first = engine.query("What is the dose?")
+        second = engine.query("What is the dose?")
+        assert first is second
+        assert inner.calls == 1
+
+        engine.query("What is the duration?")
+        assert inner.calls == 2
+
+    def test_key_depends_on_documents_not_their_order(self):
+        cache = TTLCache(10, 60)
+        inner = CountingQueryEngine()
+        CachedQueryEngine(inner, ["a", "b"], "gpt-4", cache=cache).query("Q")
+        CachedQueryEngine(inner, ["b", "a"], "gpt-4", cache=cache).query("Q")
+        assert inner.calls == 1
+
+        CachedQueryEngine(inner, ["a", "c"], "gpt-4", cache=cache).query("Q")
+        assert inner.calls == 2
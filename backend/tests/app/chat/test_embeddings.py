@@ -0,0 +1,39 @@
+from typing import List
+from unittest.mock import patch
+from diskcache import Cache
+from llama_index.embeddings.openai import OpenAIEmbedding, OpenAIEmbeddingModelType
+from app.chat.embeddings import CachedOpenAIEmbedding
+
+
+def fake_embeddings(texts: List[str]) -> List[List[float]]:
+    return [[float(len(text))] for text in texts]
+
+
+class TestCachedOpenAIEmbedding:
+    """
+    Test the CachedOpenAIEmbedding text embedding cache.
+    """
+
+    def test_only_misses_are_embedded(self, tmp_path):
+        embed_model = CachedOpenAIEmbedding(cache=Cache(str(tmp_path)))
+        with patch.object(
+            OpenAIEmbedding, "_get_text_embeddings", side_effect=fake_embeddings
+        ) as mock_embed:
+            assert embed_model._get_text_embeddings(["a", "bb"]) == [[1.0], [2.0]]
+            assert embed_model._get_text_embeddings(["ccc", "a", "bb"]) == [
+                [3.0],
+                [1.0],
+                [2.0],
+            ]
+        assert [call.args[0] for call in mock_embed.call_args_list] == [
+            ["a", "bb"],
+            ["ccc"],
+        ]
+
+    def test_cache_key_includes_model_name(self, tmp_path):
+        cache = Cache(str(tmp_path))
+        ada_model = CachedOpenAIEmbedding(cache=cache)
+        other_model = CachedOpenAIEmbedding(
+            cache=cache, model=OpenAIEmbeddingModelType.DAVINCI
+        )
+        assert ada_model._cache_key("text") != other_model._cache_key("text")
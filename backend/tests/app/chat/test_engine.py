@@ -1,10 +1,20 @@
+import asyncio
+from types import SimpleNamespace
 from typing import List, Tuple, Optional
+from unittest.mock import patch
 from uuid import UUID, uuid4
 from datetime import datetime
+import pytest
+from llama_index import Document, MockEmbedding, ServiceContext, StorageContext
 from llama_index.llms import ChatMessage
 from app.schema import Message
 from app.models.db import MessageStatusEnum, MessageRoleEnum
-from app.chat.engine import get_chat_history
+from app.chat import engine
+from app.chat.engine import (
+    abuild_index_from_documents,
+    get_chat_history,
+    get_conversation_tools,
+)
 
 
 class MockMessage(Message):
@@ -214,3 +224,175 @@ class TestGetChatHistory:
             [("Hello", "Hi"), ("How are you?", None)]
         )
         assert get_chat_history(messages) == expected_result
+
+
+class TestGetConversationTools:
+    """
+    Test the per-conversation chat tools cache.
+    """
+
+    def test_tools_are_built_once_per_conversation_documents(self):
+        builds = []
+
+        async def fake_build(conversation):
+            builds.append(conversation.id)
+            await asyncio.sleep(0)
+            return None, [conversation.id]
+
+        conversation = SimpleNamespace(
+            id=uuid4(), documents=[SimpleNamespace(id=1), SimpleNamespace(id=2)]
+        )
+        reordered = SimpleNamespace(id=conversation.id, documents=conversation.documents[::-1])
+
+        async def run():
+            return await asyncio.gather(
+                get_conversation_tools(conversation), get_conversation_tools(reordered)
+            )
+
+        with patch.object(engine, "build_conversation_tools", side_effect=fake_build):
+            first, second = asyncio.run(run())
+        assert first == second
+        assert builds == [conversation.id]
+        engine.chat_tools_cache.clear()
+
+    def test_failed_builds_are_not_cached(self):
+        async def failing_build(conversation):
+            raise RuntimeError("S3 unavailable")
+
+        conversation = SimpleNamespace(id=uuid4(), documents=[])
+        with patch.object(engine, "build_conversation_tools", side_effect=failing_build):
+            with pytest.raises(RuntimeError):
+                asyncio.run(get_conversation_tools(conversation))
+        assert len(engine.chat_tools_cache) == 0
+
+    def test_failed_builds_are_not_cached_after_the_turn_is_cancelled(self):
+        build_started = asyncio.Event()
+
+        async def failing_build(conversation):
+            build_started.set()
+            await asyncio.sleep(0)
+            raise RuntimeError("S3 unavailable")
+
+        conversation = SimpleNamespace(id=uuid4(), documents=[])
+
+        async def run():
+            turn = asyncio.ensure_future(get_conversation_tools(conversation))
+            await build_started.wait()
+            # e.g. the client disconnects while the tools are being built
+            turn.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await turn
+            # Let the shielded build finish failing
+            for _ in range(3):
+                await asyncio.sleep(0)
+            return len(engine.chat_tools_cache)
+
+        with patch.object(engine, "build_conversation_tools", side_effect=failing_build):
+            assert asyncio.run(run()) == 0
+
+
+class TestAbuildIndexFromDocuments:
+    """
+    Test building an index from inside a running event loop.
+    """
+
+    def test_nodes_are_embedded_without_nesting_event_loops(self):
+        service_context = ServiceContext.from_defaults(
+            llm=None, embed_model=MockEmbedding(embed_dim=4)
+        )
+        storage_context = StorageContext.from_defaults()
+        documents = [Document(text="Give aspirin.", doc_id="a"), Document(text="Rest.", doc_id="b")]
+
+        index = asyncio.run(
+            abuild_index_from_documents(documents, storage_context, service_context)
+        )
+
+        assert len(index.index_struct.nodes_dict) == 2
+        embeddings = storage_context.vector_store._data.embedding_dict
+        assert all(len(embedding) == 4 for embedding in embeddings.values())
+
+
+class TestBuildDocIdToIndexMap:
+    """
+    Test indexing a batch of documents where one of them fails.
+    """
+
+    def test_indexed_documents_are_persisted_when_a_later_document_fails(self):
+        service_context = ServiceContext.from_defaults(
+            llm=None, embed_model=MockEmbedding(embed_dim=4)
+        )
+        storage_context = StorageContext.from_defaults()
+        good, bad = SimpleNamespace(id=uuid4()), SimpleNamespace(id=uuid4())
+        good_indexed = asyncio.Event()
+
+        async def fake_download(doc):
+            return str(doc.id).encode()
+
+        async def fake_read(doc, data):
+            if doc is bad:
+                await good_indexed.wait()
+                raise RuntimeError("Failed to parse PDF")
+            return [Document(text="Give aspirin.", doc_id=f"{doc.id}-0")]
+
+        async def build_and_signal(*args, **kwargs):
+            index = await abuild_index_from_documents(*args, **kwargs)
+            good_indexed.set()
+            return index
+
+        async def no_vector_store():
+            return None
+
+        with patch.object(engine, "get_vector_store_singleton", no_vector_store), \
+                patch.object(engine, "get_storage_context", return_value=storage_context), \
+                patch.object(engine, "load_indices_from_storage", side_effect=ValueError), \
+                patch.object(engine.StorageContext, "from_defaults", return_value=storage_context), \
+                patch.object(engine, "download_document", fake_download), \
+                patch.object(engine, "fetch_and_read_document", fake_read), \
+                patch.object(engine, "abuild_index_from_documents", build_and_signal), \
+                patch.object(storage_context, "persist") as persist:
+            with pytest.raises(RuntimeError):
+                asyncio.run(
+                    engine.build_doc_id_to_index_map(service_context, [good, bad])
+                )
+
+        persist.assert_called_once()
+        assert storage_context.docstore.document_exists(f"{good.id}-0")
+        assert storage_context.index_store.get_index_struct(str(good.id)) is not None
+
+    def test_pending_downloads_are_cancelled_when_a_document_fails(self):
+        service_context = ServiceContext.from_defaults(
+            llm=None, embed_model=MockEmbedding(embed_dim=4)
+        )
+        storage_context = StorageContext.from_defaults()
+        bad, slow = SimpleNamespace(id=uuid4()), SimpleNamespace(id=uuid4())
+        slow_cancelled = []
+
+        async def fake_download(doc):
+            if doc is slow:
+                try:
+                    await asyncio.Event().wait()
+                except asyncio.CancelledError:
+                    slow_cancelled.append(doc)
+                    raise
+            return str(doc.id).encode()
+
+        async def fake_read(doc, data):
+            raise RuntimeError("Failed to parse PDF")
+
+        async def no_vector_store():
+            return None
+
+        async def build_and_check():
+            with pytest.raises(RuntimeError):
+                await engine.build_doc_id_to_index_map(service_context, [bad, slow])
+            # Cancelled before the failure propagated, not at event loop shutdown
+            assert slow_cancelled == [slow]
+
+        with patch.object(engine, "get_vector_store_singleton", no_vector_store), \
+                patch.object(engine, "get_storage_context", return_value=storage_context), \
+                patch.object(engine, "load_indices_from_storage", side_effect=ValueError), \
+                patch.object(engine.StorageContext, "from_defaults", return_value=storage_context), \
+                patch.object(engine, "download_document", fake_download), \
+                patch.object(engine, "fetch_and_read_document", fake_read), \
+                patch.object(storage_context, "persist"):
+            asyncio.run(build_and_check())
@@ -0,0 +1,28 @@
+from uuid import uuid4
+from app.schema import Document, DocumentMetadataKeysEnum
+from app.chat.utils import build_title_for_document
+
+
+def make_document(doc_id, title: str) -> Document:
+    return Document(
+        id=doc_id,
+        url="http://localhost:4566/clinical-guidelines-assets/ehae178.pdf",
+        metadata_map={
+            DocumentMetadataKeysEnum.CLINICAL_GUIDELINE: {
+                "title": title,
+                "issuing_organization": "EASL",
+            }
+        },
+    )
+
+
+class TestBuildTitleForDocument:
+    """
+    Test the cached document titles.
+    """
+
+    def test_title_is_rebuilt_when_metadata_changes(self):
+        doc_id = uuid4()
+        assert build_title_for_document(make_document(doc_id, "Old Title")) == "Old Title-EASL"
+        # Re-seeding updates metadata_map in place, leaving updated_at unchanged
+        assert build_title_for_document(make_document(doc_id, "New Title")) == "New Title-EASL"